@@ -3,7 +3,7 @@ Displacement Wick Strategy Optimizer
 Uses VectorBT for fast backtesting and Optuna for parameter optimization.
 
 Requirements:
-    pip install vectorbt optuna pandas numpy yfinance
+    pip install vectorbt optuna pandas numpy numba yfinance
 
 Usage:
     # Use exported TradingView data (recommended for accuracy):
@@ -17,9 +17,17 @@ import numpy as np
 import pandas as pd
 import optuna
 from datetime import datetime, timedelta
+from multiprocessing.shared_memory import SharedMemory
+from types import MappingProxyType
 import argparse
+import functools
+import hashlib
+import multiprocessing
 import os
+import shutil
+import tempfile
 import warnings
+import weakref
 warnings.filterwarnings('ignore')
 
 # Try to import vectorbt, fall back to simple backtester if not available
@@ -31,6 +39,479 @@ except ImportError:
     print("vectorbt not installed. Using simple backtester.")
     print("For faster optimization, install: pip install vectorbt")
 
+# Try to import numba, fall back to plain Python kernels if not available
+try:
+    import numba
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+    print("numba not installed. Using pure-Python kernels.")
+    print("For faster optimization, install: pip install numba")
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit so kernels run as plain Python."""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+    prange = range
+
+# trade_direction values as integer codes for gen_signals; anything else trades both ways
+_DIRECTION_CODES = {'auto': 0, 'long_only': 1, 'short_only': 2, 'both': 3}
+
+
+@njit(cache=True, parallel=True)
+def gen_signals(valid_disp, is_bull, is_bear, has_up, has_down, is_up_tr, is_down_tr,
+                mode_code, short_out, long_out):
+    """
+    Fused short/long signal masks, written into short_out and long_out in one pass.
+    mode_code is the _DIRECTION_CODES value of trade_direction.
+    """
+    for i in prange(len(valid_disp)):
+        # SHORT signal: Bullish displacement with upper wick (reversal short)
+        short = valid_disp[i] and is_bull[i] and has_up[i]
+        # LONG signal: Bearish displacement with lower wick (reversal long)
+        long = valid_disp[i] and is_bear[i] and has_down[i]
+
+        # Apply trend filter based on trade direction
+        if mode_code == 0:
+            short = short and is_down_tr[i]
+            long = long and is_up_tr[i]
+        elif mode_code == 1:
+            short = False
+        elif mode_code == 2:
+            long = False
+
+        short_out[i] = short
+        long_out[i] = long
+
+
+@njit(cache=True)
+def _run_backtest(next_open, h, l, short_sig, long_sig, stop_px, risk, target_rr,
+                  start=0, end=-1, next_free=0):
+    """
+    Simulate one position at a time over raw OHLC arrays.
+    Entries fill at the next bar's open (next_open[i] is open[i + 1]);
+    exits are checked from the bar after entry.
+
+    Only signal bars are visited: each accepted trade scans forward for its first
+    stop or target hit, and signals that fire while that trade is open are skipped.
+    Signals are taken from bars start..end (end=-1 means all bars); pass the
+    returned next_free into the following call to backtest in consecutive chunks.
+
+    Returns parallel trade arrays trimmed to the number of closed trades:
+    entry_idx, exit_idx, direction (1 long / -1 short), entry, exit, stop,
+    target, risk, exit_reason (0 stop / 1 target), followed by next_free.
+    """
+    n = len(next_open)
+    if end < 0 or end > n - 1:
+        end = n - 1
+    if start > end:
+        start = end
+    sig_idx = np.nonzero((short_sig[start:end] | long_sig[start:end]) &
+                         ~np.isnan(stop_px[start:end]))[0] + start
+    m = len(sig_idx)
+
+    entry_idx_out = np.empty(m, dtype=np.int64)
+    exit_idx_out = np.empty(m, dtype=np.int64)
+    direction_out = np.empty(m, dtype=np.int8)
+    entry_out = np.empty(m, dtype=np.float64)
+    exit_out = np.empty(m, dtype=np.float64)
+    stop_out = np.empty(m, dtype=np.float64)
+    target_out = np.empty(m, dtype=np.float64)
+    risk_out = np.empty(m, dtype=np.float64)
+    reason_out = np.empty(m, dtype=np.int8)
+    count = 0
+
+    # A trade exiting on bar j frees the book for a signal on bar j - 1,
+    # whose entry fills at the open of the exit bar
+    for k in range(m):
+        i = sig_idx[k]
+        if i < next_free:
+            continue
+
+        entry = np.float64(next_open[i])
+        risk_val = np.float64(risk[i])
+        if short_sig[i]:
+            position_dir = -1
+            stop = entry + risk_val  # Stop above entry for short
+            target = entry - (risk_val * target_rr)
+        else:
+            position_dir = 1
+            stop = entry - risk_val  # Stop below entry for long
+            target = entry + (risk_val * target_rr)
+
+        # First bar after the entry bar that hits the stop (checked first) or target
+        exit_bar = -1
+        reason = 0
+        for j in range(i + 2, n):
+            if position_dir == 1:
+                if l[j] <= stop:
+                    exit_bar = j
+                    reason = 0
+                elif h[j] >= target:
+                    exit_bar = j
+                    reason = 1
+            else:
+                if h[j] >= stop:
+                    exit_bar = j
+                    reason = 0
+                elif l[j] <= target:
+                    exit_bar = j
+                    reason = 1
+            if exit_bar != -1:
+                break
+
+        # Still open at the end of the data - nothing more can be entered
+        if exit_bar == -1:
+            next_free = n
+            break
+
+        entry_idx_out[count] = i + 1
+        exit_idx_out[count] = exit_bar
+        direction_out[count] = position_dir
+        entry_out[count] = entry
+        exit_out[count] = stop if reason == 0 else target
+        stop_out[count] = stop
+        target_out[count] = target
+        risk_out[count] = risk_val
+        reason_out[count] = reason
+        count += 1
+        next_free = exit_bar - 1
+
+    return (entry_idx_out[:count], exit_idx_out[:count], direction_out[:count],
+            entry_out[:count], exit_out[:count], stop_out[:count], target_out[:count],
+            risk_out[:count], reason_out[:count], next_free)
+
+
+@njit(cache=True)
+def rolling_std(x, n):
+    """
+    Rolling sample standard deviation (ddof=1) over the last n values.
+    Streams a Welford mean/M2 pair, swapping the oldest value out in O(1) per bar.
+    NaNs are left out of the running state; as with pandas rolling(n), a bar is
+    NaN until its whole window is finite again.
+    """
+    out = np.full(len(x), np.nan)
+    if n < 2:
+        return out
+
+    mean = 0.0
+    m2 = 0.0
+    nobs = 0
+    for i in range(len(x)):
+        v = x[i]
+        old = x[i - n] if i >= n else np.nan
+        add = not np.isnan(v)
+        remove = not np.isnan(old)
+
+        if add and remove:
+            new_mean = mean + (v - old) / nobs
+            m2 += (v - old) * (v - new_mean + old - mean)
+            mean = new_mean
+        elif remove:
+            nobs -= 1
+            if nobs == 0:
+                mean = 0.0
+                m2 = 0.0
+            else:
+                delta = old - mean
+                mean -= delta / nobs
+                m2 -= delta * (old - mean)
+        elif add:
+            nobs += 1
+            delta = v - mean
+            mean += delta / nobs
+            m2 += delta * (v - mean)
+
+        if nobs == n:
+            out[i] = np.sqrt(m2 / (n - 1)) if m2 > 0 else 0.0
+    return out
+
+
+@njit(cache=True)
+def ema(x, alpha):
+    """
+    Exponential moving average, equivalent to pandas ewm(adjust=False).mean().
+    Leading NaNs stay NaN and the average is seeded from the first finite value.
+    Later NaNs carry the last value forward and, as in pandas, the gap decays
+    its weight against the next finite value.
+    """
+    y = np.empty(len(x))
+    prev = np.nan
+    decay = 1.0
+    for i in range(len(x)):
+        cur = x[i]
+        if np.isnan(prev):
+            prev = cur
+        elif np.isnan(cur):
+            decay *= 1 - alpha
+        elif decay == 1.0:
+            prev = alpha * cur + (1 - alpha) * prev
+        else:
+            old_wt = decay * (1 - alpha)
+            prev = (old_wt * prev + alpha * cur) / (old_wt + alpha)
+            decay = 1.0
+        y[i] = prev
+    return y
+
+
+@njit(cache=True)
+def atr(h, l, c, n):
+    """
+    Average True Range over n bars.
+    True range and its simple moving average are computed in a single pass.
+    As in pandas, true range takes the largest finite of its three terms, and a
+    bar is NaN until its whole window of true ranges is finite again.
+    """
+    out = np.full(len(h), np.nan)
+    tr_window = np.full(n, np.nan)
+    total = 0.0
+    nobs = 0
+    for i in range(len(h)):
+        tr = h[i] - l[i]
+        if i > 0:
+            up = abs(h[i] - c[i - 1])
+            down = abs(l[i] - c[i - 1])
+            if not np.isnan(up) and (np.isnan(tr) or up > tr):
+                tr = up
+            if not np.isnan(down) and (np.isnan(tr) or down > tr):
+                tr = down
+
+        old = tr_window[i % n]
+        if not np.isnan(old):
+            total -= old
+            nobs -= 1
+        tr_window[i % n] = tr
+        if not np.isnan(tr):
+            total += tr
+            nobs += 1
+
+        if nobs == n:
+            out[i] = total / n
+    return out
+
+
+@njit(cache=True)
+def _max_drawdown(pnl):
+    """Largest drop of cumulative P&L from its running peak, in one pass."""
+    equity = 0.0
+    peak = -np.inf
+    max_dd = 0.0
+    for x in pnl:
+        equity += x
+        peak = max(peak, equity)
+        max_dd = max(max_dd, peak - equity)
+    return max_dd
+
+
+def calculate_metrics_fast(pnl):
+    """
+    The metrics the Optuna score needs, straight from a P&L array.
+    Returns (total_trades, win_rate, profit_factor, max_drawdown); calculate_metrics
+    builds its full report on top of these.
+    """
+    total_trades = len(pnl)
+    if total_trades == 0:
+        return 0, 0, 0, 0
+
+    wins = pnl > 0
+    gross_profit = pnl[wins].sum()
+    gross_loss = -pnl[~wins].sum()
+
+    win_rate = np.count_nonzero(wins) / total_trades * 100
+    profit_factor = gross_profit / gross_loss if gross_loss > 0 else float('inf')
+    return total_trades, win_rate, profit_factor, _max_drawdown(pnl)
+
+
+# OHLC arrays of registered DataFrames, keyed by (id(df), content hash).
+# Entries are dropped when their DataFrame is garbage collected.
+_DATA_REGISTRY = {}
+
+
+def _clear_indicator_caches():
+    """Drop every cached indicator array, for when registered data goes away or changes."""
+    _base_indicators.cache_clear()
+    _displacement.cache_clear()
+    _trend.cache_clear()
+
+
+def _evict_data(key):
+    """Forget a collected DataFrame's arrays and the indicators cached from them."""
+    if _DATA_REGISTRY.pop(key, None) is not None:
+        _clear_indicator_caches()
+
+
+def _price_dtype(df):
+    """
+    float32 if it holds every OHLC price of df exactly, else float64.
+
+    That is the case when all prices are whole multiples of a power-of-two step,
+    such as MNQ's 0.25 tick, and below 2**24 steps: each price, and each difference
+    of two prices (bodies, wicks, ranges), is then exact in float32. Cent-priced
+    data fails the check and stays float64.
+    """
+    prices = df[['open', 'high', 'low', 'close']].to_numpy(dtype=np.float64).ravel()
+    prices = prices[np.isfinite(prices)]
+    for bits in range(9):
+        steps = prices * (1 << bits)
+        if np.array_equal(steps, np.round(steps)):
+            return np.float32 if np.abs(steps).max(initial=0) < 2 ** 24 else np.float64
+    return np.float64
+
+
+def register_data(df):
+    """
+    Register a DataFrame's OHLC arrays for the indicator cache.
+    Returns the key to pass to compute_indicators.
+
+    Prices are stored as float32 when _price_dtype finds that exact, which halves
+    the memory the kernels stream through; otherwise they stay float64. Anything
+    derived by division or averaging, and all P&L, is computed in float64.
+    """
+    dtype = _price_dtype(df)
+    ohlc = {col: df[col].to_numpy(dtype=dtype) for col in ('open', 'high', 'low', 'close')}
+    for arr in ohlc.values():
+        arr.flags.writeable = False
+    digest = hashlib.md5(b''.join(arr.tobytes() for arr in ohlc.values())).hexdigest()
+    key = (id(df), digest)
+
+    if key not in _DATA_REGISTRY:
+        # Same object with different contents - cached indicators are stale
+        stale = [k for k in _DATA_REGISTRY if k[0] == id(df)]
+        for k in stale:
+            del _DATA_REGISTRY[k]
+        if stale:
+            _clear_indicator_caches()
+        _DATA_REGISTRY[key] = ohlc
+        weakref.finalize(df, _evict_data, key)
+
+    return key
+
+
+@functools.lru_cache(maxsize=8)
+def _base_indicators(data_key):
+    """Indicators that do not depend on any strategy parameter."""
+    ohlc = _DATA_REGISTRY[data_key]
+    o, h, l, c = ohlc['open'], ohlc['high'], ohlc['low'], ohlc['close']
+
+    # Body edges, computed once and shared by body and wick sizes
+    body_top = np.maximum(o, c)
+    body_bottom = np.minimum(o, c)
+
+    body = body_top - body_bottom
+    rng = h - l
+    upper_wick = h - body_top
+    lower_wick = body_bottom - l
+
+    next_open = np.empty_like(o)
+    next_open[:-1] = o[1:]
+    next_open[-1:] = np.nan
+
+    # Ratios are compared against thresholds, so divide in float64
+    body64 = body.astype(np.float64)
+    rng64 = rng.astype(np.float64)
+
+    base = {
+        'body': body,
+        'range': rng,
+        'upper_wick': upper_wick,
+        'lower_wick': lower_wick,
+        'body_top': body_top,
+        'body_bottom': body_bottom,
+
+        # Wick percentages and ratios
+        'upper_wick_pct': np.where(rng > 0, (upper_wick / rng64) * 100, 0),
+        'lower_wick_pct': np.where(rng > 0, (lower_wick / rng64) * 100, 0),
+        'upper_wick_body_ratio': np.where(body > 0, upper_wick / body64, 0),
+        'lower_wick_body_ratio': np.where(body > 0, lower_wick / body64, 0),
+
+        # ATR for stop calculation
+        'atr': atr(h, l, c, 14),
+
+        # Fill price for an entry signalled on each bar
+        'next_open': next_open,
+
+        # Candle direction
+        'is_bullish': c > o,
+        'is_bearish': c < o,
+    }
+    for arr in base.values():
+        arr.flags.writeable = False
+    return base
+
+
+def _indicator_params(p):
+    """The subset of strategy parameters that affect indicator values."""
+    return (p['displacement_length'], p['trend_ema_length'],
+            p['min_wick_pct'], p['min_wick_body_ratio'],
+            p['min_displacement_strength'], p['max_displacement_strength'])
+
+
+# Each of these caches is keyed on a single strategy parameter, and is large
+# enough to hold every value the Optuna search space can draw for one dataset
+
+@functools.lru_cache(maxsize=256)
+def _displacement(data_key, disp_len):
+    """Rolling body std dev and displacement strength (0-4) for one displacement_length."""
+    body = _base_indicators(data_key)['body']
+    body_std = rolling_std(body, disp_len)
+
+    # Thresholds are monotone, so strength is the count of multiples exceeded
+    strength = ((body > body_std).astype(np.int8) + (body > body_std * 2) +
+                (body > body_std * 3) + (body > body_std * 4))
+
+    body_std.flags.writeable = False
+    strength.flags.writeable = False
+    return body_std, strength
+
+
+@functools.lru_cache(maxsize=256)
+def _trend(data_key, ema_len):
+    """Trend EMA of the close and the up/down trend masks for one trend_ema_length."""
+    close = _DATA_REGISTRY[data_key]['close']
+    trend_ema = ema(close, 2.0 / (ema_len + 1))
+    is_up = close > trend_ema
+    is_down = close < trend_ema
+
+    for arr in (trend_ema, is_up, is_down):
+        arr.flags.writeable = False
+    return trend_ema, is_up, is_down
+
+
+def compute_indicators(data_key, disp_len, ema_len, wick_pct, wick_ratio, min_ds, max_ds):
+    """
+    Calculate all required indicators for registered data.
+
+    The rolling std dev and EMA come from caches keyed on their own length, so
+    Optuna trials reuse them whatever the other parameters are; only the cheap
+    threshold masks are built per call.
+    Returns a read-only mapping of column name -> read-only numpy array.
+    """
+    base = _base_indicators(data_key)
+    ind = dict(base)
+
+    # Displacement (body size relative to std dev)
+    ind['body_std'], ind['displacement_strength'] = _displacement(data_key, disp_len)
+
+    # Trend
+    ind['ema'], ind['is_uptrend'], ind['is_downtrend'] = _trend(data_key, ema_len)
+
+    # Significant wicks
+    ind['has_upper_wick'] = (base['upper_wick_pct'] >= wick_pct) & \
+                            (base['upper_wick_body_ratio'] >= wick_ratio)
+    ind['has_lower_wick'] = (base['lower_wick_pct'] >= wick_pct) & \
+                            (base['lower_wick_body_ratio'] >= wick_ratio)
+
+    # Valid displacement
+    ind['is_valid_displacement'] = (ind['displacement_strength'] >= min_ds) & \
+                                   (ind['displacement_strength'] <= max_ds)
+
+    for arr in ind.values():
+        arr.flags.writeable = False
+    return MappingProxyType(ind)
+
 
 class DisplacementWickStrategy:
     """
@@ -38,16 +519,28 @@ class DisplacementWickStrategy:
     Matches the Pine Script indicator/strategy logic.
     """
 
-    def __init__(self, df, params=None):
+    def __init__(self, df, params=None, indicators=None, data_key=None):
         """
         Initialize with OHLCV dataframe and parameters.
 
         Args:
             df: DataFrame with columns ['open', 'high', 'low', 'close', 'volume']
             params: Dictionary of strategy parameters
+            indicators: Optional precomputed result of compute_indicators for df
+            data_key: Optional result of register_data(df), saves re-hashing df
         """
-        self.df = df.copy()
+        self.index = df.index
         self.params = params or self.default_params()
+        self.indicators = indicators
+        self.data_key = data_key if data_key is not None else register_data(df)
+
+        # The registry entry the indicator caches read lives only as long as df,
+        # so hold on to it (not a copy) in case the caller passed a temporary frame
+        self.df = df
+
+        # Strategy state lives in plain numpy arrays; see to_frame() for a DataFrame view.
+        # The OHLC arrays are the read-only ones held by the data registry, not copies.
+        self.a = dict(_DATA_REGISTRY[self.data_key])
 
     @staticmethod
     def default_params():
@@ -88,266 +581,181 @@ class DisplacementWickStrategy:
 
     def calculate_indicators(self):
         """Calculate all required indicators."""
-        df = self.df
-        p = self.params
-
-        # Body and range
-        df['body'] = abs(df['close'] - df['open'])
-        df['range'] = df['high'] - df['low']
-
-        # Wicks
-        df['upper_wick'] = df['high'] - df[['open', 'close']].max(axis=1)
-        df['lower_wick'] = df[['open', 'close']].min(axis=1) - df['low']
-        df['body_top'] = df[['open', 'close']].max(axis=1)
-        df['body_bottom'] = df[['open', 'close']].min(axis=1)
-
-        # Wick percentages and ratios
-        df['upper_wick_pct'] = np.where(df['range'] > 0, (df['upper_wick'] / df['range']) * 100, 0)
-        df['lower_wick_pct'] = np.where(df['range'] > 0, (df['lower_wick'] / df['range']) * 100, 0)
-        df['upper_wick_body_ratio'] = np.where(df['body'] > 0, df['upper_wick'] / df['body'], 0)
-        df['lower_wick_body_ratio'] = np.where(df['body'] > 0, df['lower_wick'] / df['body'], 0)
-
-        # Displacement (body size relative to std dev)
-        df['body_std'] = df['body'].rolling(p['displacement_length']).std()
-        df['displacement_strength'] = np.where(
-            df['body'] > df['body_std'] * 4, 4,
-            np.where(df['body'] > df['body_std'] * 3, 3,
-            np.where(df['body'] > df['body_std'] * 2, 2,
-            np.where(df['body'] > df['body_std'], 1, 0))))
-
-        # Trend
-        df['ema'] = df['close'].ewm(span=p['trend_ema_length'], adjust=False).mean()
-        df['is_uptrend'] = df['close'] > df['ema']
-        df['is_downtrend'] = df['close'] < df['ema']
-
-        # ATR for stop calculation
-        df['atr'] = self._calculate_atr(df, 14)
-
-        # Candle direction
-        df['is_bullish'] = df['close'] > df['open']
-        df['is_bearish'] = df['close'] < df['open']
-
-        # Significant wicks
-        df['has_upper_wick'] = (df['upper_wick_pct'] >= p['min_wick_pct']) & \
-                               (df['upper_wick_body_ratio'] >= p['min_wick_body_ratio'])
-        df['has_lower_wick'] = (df['lower_wick_pct'] >= p['min_wick_pct']) & \
-                               (df['lower_wick_body_ratio'] >= p['min_wick_body_ratio'])
-
-        # Valid displacement
-        df['is_valid_displacement'] = (df['displacement_strength'] >= p['min_displacement_strength']) & \
-                                       (df['displacement_strength'] <= p['max_displacement_strength'])
-
-        self.df = df
-        return df
-
-    def _calculate_atr(self, df, period=14):
-        """Calculate Average True Range."""
-        high = df['high']
-        low = df['low']
-        close = df['close'].shift(1)
-
-        tr1 = high - low
-        tr2 = abs(high - close)
-        tr3 = abs(low - close)
+        ind = self.indicators
+        if ind is None:
+            ind = compute_indicators(self.data_key, *_indicator_params(self.params))
 
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-        return tr.rolling(period).mean()
+        self.a.update(ind)
+        return self.a
 
     def generate_signals(self):
         """Generate entry signals based on displacement wick criteria."""
-        df = self.df
-        p = self.params
+        a = self.a
+        n = len(a['is_valid_displacement'])
 
-        # SHORT signal: Bullish displacement with upper wick (reversal short)
-        short_base = df['is_valid_displacement'] & df['is_bullish'] & df['has_upper_wick']
+        a['short_signal'] = np.empty(n, dtype=np.bool_)
+        a['long_signal'] = np.empty(n, dtype=np.bool_)
+        gen_signals(a['is_valid_displacement'], a['is_bullish'], a['is_bearish'],
+                    a['has_upper_wick'], a['has_lower_wick'], a['is_uptrend'], a['is_downtrend'],
+                    _DIRECTION_CODES.get(self.params['trade_direction'], 3),
+                    a['short_signal'], a['long_signal'])
 
-        # LONG signal: Bearish displacement with lower wick (reversal long)
-        long_base = df['is_valid_displacement'] & df['is_bearish'] & df['has_lower_wick']
-
-        # Apply trend filter based on trade direction
-        if p['trade_direction'] == 'auto':
-            df['short_signal'] = short_base & df['is_downtrend']
-            df['long_signal'] = long_base & df['is_uptrend']
-        elif p['trade_direction'] == 'long_only':
-            df['short_signal'] = False
-            df['long_signal'] = long_base
-        elif p['trade_direction'] == 'short_only':
-            df['short_signal'] = short_base
-            df['long_signal'] = False
-        else:  # both
-            df['short_signal'] = short_base
-            df['long_signal'] = long_base
-
-        self.df = df
-        return df
+        return a
 
     def calculate_stops_targets(self):
         """Calculate stop loss and take profit levels for each signal."""
-        df = self.df
+        a = self.a
         p = self.params
 
-        # Initialize columns
-        df['stop_price'] = np.nan
-        df['target_price'] = np.nan
-        df['risk'] = np.nan
+        # Stops and risk feed P&L, so work in float64 even when prices are float32
+        high = a['high'].astype(np.float64)
+        low = a['low'].astype(np.float64)
+        short_mask = a['short_signal']
+        long_mask = a['long_signal']
 
         # Calculate stop distance based on method
-        if p['stop_method'] == 'atr':
-            stop_distance = df['atr'] * p['atr_stop_mult']
+        if p['stop_method'] == 'wick_extreme':
+            short_distance = a['upper_wick'].astype(np.float64) * p['wick_extreme_mult']
+            long_distance = a['lower_wick'].astype(np.float64) * p['wick_extreme_mult']
+        elif p['stop_method'] == 'atr':
+            short_distance = long_distance = a['atr'] * p['atr_stop_mult']
         elif p['stop_method'] == 'fixed_ticks':
-            # Fixed ticks - create a Series with constant value
-            stop_distance = pd.Series(p['fixed_stop_ticks'] * p['tick_size'], index=df.index)
+            short_distance = long_distance = p['fixed_stop_ticks'] * p['tick_size']
         else:
-            stop_distance = pd.Series(0, index=df.index)  # Will use wick extreme
-
-        # SHORT setups
-        short_mask = df['short_signal']
-        if short_mask.any():
-            if p['stop_method'] == 'wick_extreme':
-                df.loc[short_mask, 'stop_price'] = df.loc[short_mask, 'high'] + \
-                    (df.loc[short_mask, 'upper_wick'] * p['wick_extreme_mult'])
-            else:
-                df.loc[short_mask, 'stop_price'] = df.loc[short_mask, 'high'] + stop_distance.loc[short_mask]
-
-            # Entry at zone (candle high for shorts)
-            entry = df.loc[short_mask, 'high']
-            risk = df.loc[short_mask, 'stop_price'] - entry
-            df.loc[short_mask, 'risk'] = risk
-
-            if p['target_method'] == 'fixed_rr':
-                df.loc[short_mask, 'target_price'] = entry - (risk * p['target_rr'])
-            elif p['target_method'] == 'wick_fill':
-                df.loc[short_mask, 'target_price'] = df.loc[short_mask, 'body_top']
-            elif p['target_method'] == 'entire_candle':
-                df.loc[short_mask, 'target_price'] = df.loc[short_mask, 'low']  # SHORT target = candle low
-            else:  # body_fill
-                df.loc[short_mask, 'target_price'] = df.loc[short_mask, 'body_bottom']
-
-        # LONG setups
-        long_mask = df['long_signal']
-        if long_mask.any():
-            if p['stop_method'] == 'wick_extreme':
-                df.loc[long_mask, 'stop_price'] = df.loc[long_mask, 'low'] - \
-                    (df.loc[long_mask, 'lower_wick'] * p['wick_extreme_mult'])
-            else:
-                df.loc[long_mask, 'stop_price'] = df.loc[long_mask, 'low'] - stop_distance.loc[long_mask]
-
-            # Entry at zone (candle low for longs)
-            entry = df.loc[long_mask, 'low']
-            risk = entry - df.loc[long_mask, 'stop_price']
-            df.loc[long_mask, 'risk'] = risk
-
-            if p['target_method'] == 'fixed_rr':
-                df.loc[long_mask, 'target_price'] = entry + (risk * p['target_rr'])
-            elif p['target_method'] == 'wick_fill':
-                df.loc[long_mask, 'target_price'] = df.loc[long_mask, 'body_bottom']
-            elif p['target_method'] == 'entire_candle':
-                df.loc[long_mask, 'target_price'] = df.loc[long_mask, 'high']  # LONG target = candle high
-            else:  # body_fill
-                df.loc[long_mask, 'target_price'] = df.loc[long_mask, 'body_top']
-
-        # Apply max risk filter
-        if p['use_max_risk_filter']:
-            max_risk = p['max_risk_ticks'] * p['tick_size']
-            df.loc[df['risk'] > max_risk, 'short_signal'] = False
-            df.loc[df['risk'] > max_risk, 'long_signal'] = False
+            short_distance = long_distance = 0.0
 
-        self.df = df
-        return df
+        # Stops beyond the zone (candle high for shorts, candle low for longs)
+        stop_price = np.where(short_mask, high + short_distance,
+                              np.where(long_mask, low - long_distance, np.nan))
+        risk = np.where(short_mask, stop_price - high,
+                        np.where(long_mask, low - stop_price, np.nan))
 
-    def backtest(self):
+        # Apply max risk filter before targets, so rejected setups get none
+        if p['use_max_risk_filter']:
+            valid = ~(risk > p['max_risk_ticks'] * p['tick_size'])
+            short_mask = short_mask & valid
+            long_mask = long_mask & valid
+
+        if p['target_method'] == 'fixed_rr':
+            short_target = high - (risk * p['target_rr'])
+            long_target = low + (risk * p['target_rr'])
+        elif p['target_method'] == 'wick_fill':
+            short_target = a['body_top']
+            long_target = a['body_bottom']
+        elif p['target_method'] == 'entire_candle':
+            short_target = low   # SHORT target = candle low
+            long_target = high   # LONG target = candle high
+        else:  # body_fill
+            short_target = a['body_bottom']
+            long_target = a['body_top']
+
+        target_price = np.where(short_mask, short_target,
+                                np.where(long_mask, long_target, np.nan))
+
+        a['stop_price'] = stop_price
+        a['target_price'] = target_price
+        a['risk'] = risk
+        a['short_signal'] = short_mask
+        a['long_signal'] = long_mask
+
+        return a
+
+    def backtest(self, trial=None, n_epochs=4, with_trades=True):
         """
         Run backtest and return performance metrics.
-        Simple implementation that simulates trade execution.
+        Set with_trades=False to skip building the trades DataFrame.
+        """
+        return self.calculate_metrics(self.simulate_trades(trial, n_epochs), with_trades)
+
+    def simulate_trades(self, trial=None, n_epochs=4):
         """
-        df = self.df.copy()
+        Simulate trade execution and return the trades as a dict of parallel arrays.
+
+        With an Optuna trial, the bars are simulated in n_epochs chunks and the
+        running profit factor is reported after each one, so unpromising trials
+        can be pruned before the whole history has been backtested.
+        """
+        a = self.a
         p = self.params
+        args = (a['next_open'], a['high'], a['low'], a['short_signal'], a['long_signal'],
+                a['stop_price'], a['risk'], p['target_rr'])
+
+        if trial is None:
+            chunks = [_run_backtest(*args)[:-1]]
+        else:
+            bounds = np.linspace(0, len(a['open']), n_epochs + 1).astype(np.int64)
+            chunks = []
+            next_free = 0
+            gross_profit = gross_loss = 0.0
+            for epoch in range(n_epochs):
+                *chunk, next_free = _run_backtest(*args, bounds[epoch], bounds[epoch + 1], next_free)
+                chunks.append(chunk)
+
+                direction, entry, exit_price = chunk[2], chunk[3], chunk[4]
+                chunk_pnl = np.where(direction == 1, exit_price - entry, entry - exit_price)
+                gross_profit += chunk_pnl[chunk_pnl > 0].sum()
+                gross_loss -= chunk_pnl[chunk_pnl <= 0].sum()
+                if gross_loss > 0:
+                    running_pf = gross_profit / gross_loss
+                else:
+                    running_pf = float('inf') if gross_profit > 0 else 0.0
+
+                trial.report(running_pf, step=epoch)
+                if trial.should_prune():
+                    raise optuna.TrialPruned()
+
+        (entry_idx, exit_idx, direction, entry, exit_price, stop, target,
+         risk, exit_reason) = [np.concatenate(col) for col in zip(*chunks)]
+
+        pnl = np.where(direction == 1, exit_price - entry, entry - exit_price)
+        pnl_ticks = pnl / p['tick_size']
+        r_multiple = np.zeros_like(pnl)
+        np.divide(pnl, risk, out=r_multiple, where=risk > 0)
+
+        pnl_dollars = pnl_ticks * p['tick_value']
 
-        trades = []
-        position = None
-
-        for i in range(len(df) - 1):
-            row = df.iloc[i]
-            next_row = df.iloc[i + 1]
-
-            # Check for exit if in position
-            if position is not None:
-                exit_price = None
-                exit_reason = None
-
-                if position['direction'] == 'long':
-                    # Check stop
-                    if next_row['low'] <= position['stop']:
-                        exit_price = position['stop']
-                        exit_reason = 'stop'
-                    # Check target
-                    elif next_row['high'] >= position['target']:
-                        exit_price = position['target']
-                        exit_reason = 'target'
-                else:  # short
-                    # Check stop
-                    if next_row['high'] >= position['stop']:
-                        exit_price = position['stop']
-                        exit_reason = 'stop'
-                    # Check target
-                    elif next_row['low'] <= position['target']:
-                        exit_price = position['target']
-                        exit_reason = 'target'
-
-                if exit_price is not None:
-                    pnl = (exit_price - position['entry']) if position['direction'] == 'long' \
-                          else (position['entry'] - exit_price)
-                    pnl_ticks = pnl / p['tick_size']
-                    pnl_dollars = pnl_ticks * p['tick_value']
-
-                    trades.append({
-                        'entry_time': position['entry_time'],
-                        'exit_time': df.index[i + 1],
-                        'direction': position['direction'],
-                        'entry': position['entry'],
-                        'exit': exit_price,
-                        'stop': position['stop'],
-                        'target': position['target'],
-                        'pnl_points': pnl,
-                        'pnl_ticks': pnl_ticks,
-                        'pnl_dollars': pnl_dollars,
-                        'exit_reason': exit_reason,
-                        'risk': position['risk'],
-                        'r_multiple': pnl / position['risk'] if position['risk'] > 0 else 0
-                    })
-                    position = None
-
-            # Check for new entry (only if not in position)
-            if position is None:
-                # Entry at next bar's open (simulating real execution)
-                if row['short_signal'] and not pd.isna(row['stop_price']):
-                    entry_price = next_row['open']
-                    risk = row['risk']
-                    position = {
-                        'direction': 'short',
-                        'entry': entry_price,
-                        'entry_time': df.index[i + 1],
-                        'stop': entry_price + risk,  # Stop above entry for short
-                        'target': entry_price - (risk * p['target_rr']),
-                        'risk': risk
-                    }
-                elif row['long_signal'] and not pd.isna(row['stop_price']):
-                    entry_price = next_row['open']
-                    risk = row['risk']
-                    position = {
-                        'direction': 'long',
-                        'entry': entry_price,
-                        'entry_time': df.index[i + 1],
-                        'stop': entry_price - risk,  # Stop below entry for long
-                        'target': entry_price + (risk * p['target_rr']),
-                        'risk': risk
-                    }
-
-        return self.calculate_metrics(trades)
-
-    def calculate_metrics(self, trades):
-        """Calculate performance metrics from trade list."""
-        if not trades:
+        return {
+            'entry_idx': entry_idx,
+            'exit_idx': exit_idx,
+            'direction': direction,
+            'entry': entry,
+            'exit': exit_price,
+            'stop': stop,
+            'target': target,
+            'pnl_points': pnl,
+            'pnl_ticks': pnl_ticks,
+            'pnl_dollars': pnl_dollars,
+            'exit_reason': exit_reason,
+            'risk': risk,
+            'r_multiple': r_multiple,
+        }
+
+    def trades_frame(self, trades):
+        """Build the trade history DataFrame from the columnar trade arrays."""
+        return pd.DataFrame({
+            'entry_time': self.index[trades['entry_idx']],
+            'exit_time': self.index[trades['exit_idx']],
+            'direction': np.where(trades['direction'] == 1, 'long', 'short'),
+            'entry': trades['entry'],
+            'exit': trades['exit'],
+            'stop': trades['stop'],
+            'target': trades['target'],
+            'pnl_points': trades['pnl_points'],
+            'pnl_ticks': trades['pnl_ticks'],
+            'pnl_dollars': trades['pnl_dollars'],
+            'exit_reason': np.where(trades['exit_reason'] == 0, 'stop', 'target'),
+            'risk': trades['risk'],
+            'r_multiple': trades['r_multiple'],
+        })
+
+    def calculate_metrics(self, trades, with_trades=True):
+        """
+        Calculate performance metrics from the columnar trade arrays.
+        The trades DataFrame is only built when with_trades is set.
+        """
+        pnl = trades['pnl_dollars']
+        total_trades = len(pnl)
+        if total_trades == 0:
             return {
                 'total_trades': 0,
                 'win_rate': 0,
@@ -360,40 +768,36 @@ class DisplacementWickStrategy:
                 'avg_r': 0,
             }
 
-        trades_df = pd.DataFrame(trades)
-
-        winners = trades_df[trades_df['pnl_dollars'] > 0]
-        losers = trades_df[trades_df['pnl_dollars'] <= 0]
-
-        gross_profit = winners['pnl_dollars'].sum() if len(winners) > 0 else 0
-        gross_loss = abs(losers['pnl_dollars'].sum()) if len(losers) > 0 else 0
-
-        # Calculate drawdown
-        cumulative = trades_df['pnl_dollars'].cumsum()
-        rolling_max = cumulative.cummax()
-        drawdown = rolling_max - cumulative
-        max_drawdown = drawdown.max()
-
-        return {
-            'total_trades': len(trades),
-            'win_rate': len(winners) / len(trades) * 100 if len(trades) > 0 else 0,
-            'profit_factor': gross_profit / gross_loss if gross_loss > 0 else float('inf'),
-            'total_pnl': trades_df['pnl_dollars'].sum(),
-            'avg_winner': winners['pnl_dollars'].mean() if len(winners) > 0 else 0,
-            'avg_loser': losers['pnl_dollars'].mean() if len(losers) > 0 else 0,
+        total_trades, win_rate, profit_factor, max_drawdown = calculate_metrics_fast(pnl)
+        winners = pnl[pnl > 0]
+        losers = pnl[pnl <= 0]
+        std = pnl.std(ddof=1) if total_trades > 1 else 0
+
+        results = {
+            'total_trades': total_trades,
+            'win_rate': win_rate,
+            'profit_factor': profit_factor,
+            'total_pnl': pnl.sum(),
+            'avg_winner': winners.mean() if len(winners) > 0 else 0,
+            'avg_loser': losers.mean() if len(losers) > 0 else 0,
             'max_drawdown': max_drawdown,
-            'sharpe': trades_df['pnl_dollars'].mean() / trades_df['pnl_dollars'].std() \
-                      if trades_df['pnl_dollars'].std() > 0 else 0,
-            'avg_r': trades_df['r_multiple'].mean(),
-            'trades': trades_df
+            'sharpe': pnl.mean() / std if std > 0 else 0,
+            'avg_r': trades['r_multiple'].mean(),
         }
+        if with_trades:
+            results['trades'] = self.trades_frame(trades)
+        return results
+
+    def to_frame(self):
+        """Return the OHLC data plus every computed column as a DataFrame."""
+        return pd.DataFrame(self.a, index=self.index)
 
-    def run(self):
+    def run(self, with_trades=True):
         """Run full strategy pipeline."""
         self.calculate_indicators()
         self.generate_signals()
         self.calculate_stops_targets()
-        return self.backtest()
+        return self.backtest(with_trades=with_trades)
 
 
 def load_csv_data(filepath):
@@ -489,9 +893,10 @@ def load_data(symbol='MNQ=F', start_date=None, end_date=None, interval='5m'):
     return df
 
 
-def objective(trial, df):
+def objective(trial, df, data_key=None):
     """
     Optuna objective function for hyperparameter optimization.
+    Pass data_key from register_data(df) to skip re-hashing df every trial.
     """
     params = {
         # Displacement
@@ -532,28 +937,179 @@ def objective(trial, df):
     if params['max_displacement_strength'] < params['min_displacement_strength']:
         params['max_displacement_strength'] = params['min_displacement_strength']
 
-    strategy = DisplacementWickStrategy(df, params)
-    results = strategy.run()
+    if data_key is None:
+        data_key = register_data(df)
+
+    indicators = compute_indicators(data_key, *_indicator_params(params))
+    strategy = DisplacementWickStrategy(df, params, indicators=indicators, data_key=data_key)
+    strategy.calculate_indicators()
+    strategy.generate_signals()
+    strategy.calculate_stops_targets()
+    trades = strategy.simulate_trades(trial)
+    total_trades, win_rate, profit_factor, max_drawdown = calculate_metrics_fast(trades['pnl_dollars'])
 
     # Objective: maximize profit factor while maintaining minimum trade count
-    if results['total_trades'] < 20:
+    if total_trades < 20:
         return -1000  # Penalize too few trades
 
     # Composite score: profit factor + win rate bonus - drawdown penalty
-    score = results['profit_factor'] + (results['win_rate'] / 100) - (results['max_drawdown'] / 1000)
+    score = profit_factor + (win_rate / 100) - (max_drawdown / 1000)
 
     return score
 
 
-def run_optimization(df, n_trials=100):
+def _study_options():
+    """Sampler and pruner shared by every optimization study."""
+    return {
+        'sampler': optuna.samplers.TPESampler(multivariate=True, n_startup_trials=20),
+        'pruner': optuna.pruners.MedianPruner(n_warmup_steps=1),
+    }
+
+
+def _share_ohlcv(df):
+    """
+    Copy the OHLCV columns of df into shared memory blocks.
+    Returns (blocks, specs) where specs are (column, shm name, length, dtype) tuples
+    that worker processes use to attach without unpickling the DataFrame.
+    """
+    blocks, specs = [], []
+    price_dtype = _price_dtype(df)
+    for col in ('open', 'high', 'low', 'close', 'volume'):
+        if col not in df.columns:
+            continue
+        # Volume keeps its own dtype; the price dtype is only exact for OHLC
+        dtype = None if col == 'volume' else price_dtype
+        arr = np.ascontiguousarray(df[col].to_numpy(dtype=dtype))
+        shm = SharedMemory(create=True, size=max(arr.nbytes, 1))
+        np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[:] = arr
+        blocks.append(shm)
+        specs.append((col, shm.name, len(arr), arr.dtype.str))
+    return blocks, specs
+
+
+def _open_storage(url):
+    """
+    Optuna storage for a database URL.
+    SQLite gets a generous lock timeout so worker processes can share one file.
+    """
+    if url.startswith('sqlite'):
+        return optuna.storages.RDBStorage(url, engine_kwargs={'connect_args': {'timeout': 60}})
+    return url
+
+
+def _optimize_worker(study_name, storage_url, specs, n_trials):
+    """Worker process: attach to the shared OHLCV arrays and run trials on the shared study."""
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    if HAS_NUMBA:
+        # Each worker already has a core; avoid oversubscribing with kernel threads
+        numba.set_num_threads(1)
+    blocks = [SharedMemory(name=name) for _, name, _, _ in specs]
+    df = pd.DataFrame(
+        {col: np.ndarray((n,), dtype=np.dtype(dtype), buffer=shm.buf)
+         for (col, _, n, dtype), shm in zip(specs, blocks)},
+        copy=False,
+    )
+
+    study = optuna.load_study(study_name=study_name, storage=_open_storage(storage_url),
+                              **_study_options())
+    data_key = register_data(df)
+    study.optimize(functools.partial(objective, df=df, data_key=data_key), n_trials=n_trials)
+
+    # Drop every view into the shared buffers before detaching
+    del df
+    _DATA_REGISTRY.clear()
+    _clear_indicator_caches()
+    for shm in blocks:
+        shm.close()
+
+
+def _optimize_parallel(df, study_name, storage_url, n_trials, n_jobs):
+    """Run n_trials across n_jobs processes that all append to one stored study."""
+    blocks, specs = _share_ohlcv(df)
+
+    try:
+        ctx = multiprocessing.get_context('spawn')
+        workers = []
+        for i in range(n_jobs):
+            worker_trials = n_trials // n_jobs + (1 if i < n_trials % n_jobs else 0)
+            if worker_trials == 0:
+                continue
+            proc = ctx.Process(target=_optimize_worker,
+                               args=(study_name, storage_url, specs, worker_trials))
+            proc.start()
+            workers.append(proc)
+
+        for proc in workers:
+            proc.join()
+
+        # A crashed worker only prints its traceback to stderr; don't report a short study as success
+        failed = [f"worker {i} (pid {proc.pid}) exited with code {proc.exitcode}"
+                  for i, proc in enumerate(workers) if proc.exitcode != 0]
+        if failed:
+            raise RuntimeError("Optimization worker(s) failed, see traceback above: "
+                               + "; ".join(failed))
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+
+def run_optimization(df, n_trials=100, n_jobs=1, storage=None):
     """
     Run Optuna optimization to find best parameters.
+    With n_jobs > 1, trials run in separate processes (0 = one per CPU core).
+
+    With a storage URL such as 'sqlite:///dw_study.db', the study is named after a
+    hash of the price data and resumed by later runs on the same data, so
+    n_trials is the total to reach rather than the number of new trials.
     """
-    print(f"\nStarting optimization with {n_trials} trials...")
-    print("This may take a few minutes...\n")
+    if n_jobs == 0:
+        n_jobs = os.cpu_count() or 1
+
+    data_key = register_data(df)
 
-    study = optuna.create_study(direction='maximize')
-    study.optimize(lambda trial: objective(trial, df), n_trials=n_trials, show_progress_bar=True)
+    # Worker processes need storage they can all reach; use a throwaway file if none given
+    tmp_dir = None
+    storage_url = storage
+    if storage_url is None and n_jobs > 1:
+        tmp_dir = tempfile.mkdtemp(prefix='dw_optuna_')
+        storage_url = f"sqlite:///{os.path.join(tmp_dir, 'study.db')}"
+
+    try:
+        study = optuna.create_study(
+            direction='maximize',
+            storage=_open_storage(storage_url) if storage_url else None,
+            study_name=f'dw_{data_key[1][:12]}' if storage else None,
+            load_if_exists=True,
+            **_study_options(),
+        )
+
+        finished = len(study.get_trials(deepcopy=False, states=(optuna.trial.TrialState.COMPLETE,
+                                                                 optuna.trial.TrialState.PRUNED)))
+        remaining = max(0, n_trials - finished)
+        if finished:
+            print(f"\nResuming study '{study.study_name}' with {finished} finished trials")
+
+        print(f"\nStarting optimization with {remaining} trials...")
+        if n_jobs > 1:
+            print(f"Running {n_jobs} worker processes")
+        print("This may take a few minutes...\n")
+
+        if remaining and n_jobs > 1:
+            _optimize_parallel(df, study.study_name, storage_url, remaining, n_jobs)
+        elif remaining:
+            study.optimize(lambda trial: objective(trial, df, data_key), n_trials=remaining,
+                           show_progress_bar=True)
+
+        if tmp_dir is not None:
+            # Copy every worker's trials into memory before the database is removed
+            memory = optuna.storages.InMemoryStorage()
+            optuna.copy_study(from_study_name=study.study_name, from_storage=_open_storage(storage_url),
+                              to_storage=memory)
+            study = optuna.load_study(study_name=study.study_name, storage=memory)
+    finally:
+        if tmp_dir is not None:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
 
     print("\n" + "="*60)
     print("OPTIMIZATION COMPLETE")
@@ -592,6 +1148,10 @@ def main():
     parser.add_argument('--data', '-d', type=str, help='Path to CSV file with OHLCV data (exported from TradingView)')
     parser.add_argument('--trials', '-t', type=int, default=100, help='Number of optimization trials (default: 100)')
     parser.add_argument('--symbol', '-s', type=str, default='MNQ=F', help='Yahoo Finance symbol if not using CSV (default: MNQ=F)')
+    parser.add_argument('--jobs', '-j', type=int, default=1, help='Worker processes for optimization, 0 = all cores (default: 1)')
+    parser.add_argument('--storage', type=str, default='sqlite:///dw_study.db',
+                        help='Optuna storage URL; runs on the same data resume the stored study. '
+                             'Pass "" for a throwaway in-memory study (default: sqlite:///dw_study.db)')
     args = parser.parse_args()
 
     print("="*60)
@@ -631,7 +1191,8 @@ def main():
         return
 
     # Run optimization
-    study, best_params, results = run_optimization(df, n_trials=args.trials)
+    study, best_params, results = run_optimization(df, n_trials=args.trials, n_jobs=args.jobs,
+                                                storage=args.storage or None)
 
     # Save results
     print("\n" + "="*60)
@@ -25,7 +25,7 @@ source optimizer_env/bin/activate
 echo ""
 echo "Installing required packages..."
 pip install --upgrade pip
-pip install pandas numpy yfinance optuna tqdm
+pip install pandas numpy numba yfinance optuna tqdm
 
 # Optional: Install vectorbt for faster backtesting (can be slow to install)
 echo ""
@@ -0,0 +1,121 @@
+"""
+Regression checks for displacement_wick_optimizer.
+
+Run with: python -m unittest test_displacement_wick_optimizer
+"""
+
+import gc
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+import displacement_wick_optimizer as dwo
+
+
+def make_bars(n=6000, start=20000.0, tick=0.25, seed=7):
+    """Random-walk OHLC bars with every price on the tick grid."""
+    rng = np.random.default_rng(seed)
+    close = start + np.cumsum(rng.integers(-12, 13, n)) * tick
+    open_ = np.roll(close, 1)
+    open_[0] = start
+    high = np.maximum(open_, close) + rng.integers(0, 9, n) * tick
+    low = np.minimum(open_, close) - rng.integers(0, 9, n) * tick
+    index = pd.date_range('2024-01-02 09:30', periods=n, freq='5min')
+    return pd.DataFrame({'open': open_, 'high': high, 'low': low, 'close': close,
+                         'volume': rng.integers(100, 5000, n)}, index=index)
+
+
+def make_cent_bars(n=6000, start=447.0, seed=11):
+    """Random-walk OHLC bars priced in cents, which float32 cannot hold exactly."""
+    rng = np.random.default_rng(seed)
+    close = np.round(start + np.cumsum(rng.normal(0, 0.12, n)), 2)
+    open_ = np.round(np.r_[start, close[:-1]] + rng.normal(0, 0.02, n), 2)
+    high = np.round(np.maximum(open_, close) + np.abs(rng.normal(0, 0.08, n)), 2)
+    low = np.round(np.minimum(open_, close) - np.abs(rng.normal(0, 0.08, n)), 2)
+    index = pd.date_range('2024-01-02 09:30', periods=n, freq='5min')
+    return pd.DataFrame({'open': open_, 'high': high, 'low': low, 'close': close,
+                         'volume': rng.integers(100, 5000, n)}, index=index)
+
+
+def params(**overrides):
+    p = dwo.DisplacementWickStrategy.default_params()
+    p['trade_direction'] = 'both'
+    p.update(overrides)
+    return p
+
+
+class TemporaryFrameTest(unittest.TestCase):
+    """A strategy built from a temporary frame must outlive that frame."""
+
+    def setUp(self):
+        self.df = make_bars()
+        self.expected = dwo.DisplacementWickStrategy(self.df.iloc[:5000].copy(), params()).run()
+
+    def assertSameResults(self, results):
+        self.assertEqual(results['total_trades'], self.expected['total_trades'])
+        self.assertEqual(results['total_pnl'], self.expected['total_pnl'])
+
+    def test_slice(self):
+        strategy = dwo.DisplacementWickStrategy(self.df.iloc[:5000], params())
+        gc.collect()
+        self.assertSameResults(strategy.run())
+
+    def test_boolean_mask(self):
+        strategy = dwo.DisplacementWickStrategy(self.df[np.arange(len(self.df)) < 5000], params())
+        gc.collect()
+        self.assertSameResults(strategy.run())
+
+    def test_registry_entry_dropped_with_frame(self):
+        strategy = dwo.DisplacementWickStrategy(self.df.iloc[:5000], params())
+        key = strategy.data_key
+        strategy.run()
+        self.assertIn(key, dwo._DATA_REGISTRY)
+        del strategy
+        gc.collect()
+        self.assertNotIn(key, dwo._DATA_REGISTRY)
+
+
+class PriceDtypeTest(unittest.TestCase):
+    """Prices stored as float32 must give the same trades as the float64 path."""
+
+    PARAM_SETS = [
+        dict(stop_method='atr', target_method='fixed_rr'),
+        dict(stop_method='wick_extreme', wick_extreme_mult=1.75, target_method='wick_fill'),
+        dict(stop_method='wick_extreme', wick_extreme_mult=1.1, target_method='fixed_rr'),
+        dict(stop_method='fixed_ticks', fixed_stop_ticks=20, target_method='body_fill'),
+        dict(stop_method='atr', atr_stop_mult=2.25, trade_direction='auto', target_rr=1.5),
+        dict(displacement_length=60, min_wick_pct=25.0, min_wick_body_ratio=0.4,
+             trend_ema_length=30, target_method='entire_candle'),
+    ]
+
+    def assertMatchesFloat64(self, df, **fixed):
+        for overrides in self.PARAM_SETS:
+            p = params(**dict(fixed, **overrides))
+            results = dwo.DisplacementWickStrategy(df.copy(), dict(p)).run()
+            with mock.patch.object(dwo, '_price_dtype', return_value=np.float64):
+                expected = dwo.DisplacementWickStrategy(df.copy(), dict(p)).run()
+
+            self.assertGreater(expected['total_trades'], 0)
+            self.assertEqual(results['total_trades'], expected['total_trades'])
+            self.assertEqual(results['total_pnl'], expected['total_pnl'])
+            pd.testing.assert_frame_equal(results['trades'], expected['trades'])
+
+    def test_tick_prices_use_float32(self):
+        df = make_bars()
+        self.assertIs(dwo._price_dtype(df), np.float32)
+        self.assertMatchesFloat64(df)
+
+    def test_cent_prices_stay_float64(self):
+        df = make_cent_bars()
+        self.assertIs(dwo._price_dtype(df), np.float64)
+        self.assertMatchesFloat64(df, tick_size=0.01, tick_value=1.0, max_risk_ticks=100)
+
+        # Fills are the quoted prices, with no float32 rounding noise
+        trades = dwo.DisplacementWickStrategy(df, params(tick_size=0.01)).run()['trades']
+        self.assertTrue(np.isin(trades['entry'].to_numpy(), df['open'].to_numpy()).all())
+
+
+if __name__ == '__main__':
+    unittest.main()